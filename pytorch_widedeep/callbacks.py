@@ -4,8 +4,16 @@ Code here is mostly based on the code from the torchsample and Keras packages
 CREDIT TO THE TORCHSAMPLE AND KERAS TEAMS
 """
 import os
-import datetime
+import math
+import time
+import pickle
+import numbers
+import weakref
+import operator
 import warnings
+from collections import deque
+from types import MappingProxyType
+from concurrent.futures import ThreadPoolExecutor
 
 import numpy as np
 import torch
@@ -14,9 +22,102 @@ from torch.optim.lr_scheduler import ReduceLROnPlateau
 from pytorch_widedeep.metrics import MultipleMetrics
 from pytorch_widedeep.wdtypes import *  # noqa: F403
 
+# read-only fallback for the built-in callbacks that only read the logs, so
+# that no new dictionary is allocated when they are called without any
+_EMPTY_LOGS: Mapping = MappingProxyType({})
+
 
 def _get_current_time():
-    return datetime.datetime.now().strftime("%B %d, %Y - %I:%M%p")
+    return time.strftime("%B %d, %Y - %I:%M%p")
+
+
+def _state_dict_snapshot(model: Any) -> Dict[str, Tensor]:
+    # copy of the weights that is safe to keep (or write) while training
+    # carries on updating the parameters in place
+    return {k: v.detach().cpu().clone() for k, v in model.state_dict().items()}
+
+
+def _save_state_dict(state_dict: Dict, filepath: str):
+    # zipfile format and the highest pickle protocol available (5 from
+    # python 3.8) are faster to write and produce smaller files
+    torch.save(
+        state_dict,
+        filepath,
+        _use_new_zipfile_serialization=True,
+        pickle_protocol=pickle.HIGHEST_PROTOCOL,
+    )
+
+
+def _has_changed(tensor: Tensor, base_tensor: Tensor, threshold: float) -> bool:
+    if tensor.is_floating_point():
+        # written so that NaNs count as a change
+        return not bool(((tensor - base_tensor).abs() <= threshold).all())
+    return not torch.equal(tensor, base_tensor)
+
+
+def _save_delta_state_dict(
+    state_dict: Dict[str, Tensor],
+    base_state_dict: Dict[str, Tensor],
+    base_filepath: str,
+    filepath: str,
+    threshold: float,
+):
+    delta_state_dict = {
+        k: v
+        for k, v in state_dict.items()
+        if _has_changed(v, base_state_dict[k], threshold)
+    }
+    _save_state_dict(
+        {
+            "delta_base": os.path.basename(base_filepath),
+            "delta_state_dict": delta_state_dict,
+        },
+        filepath,
+    )
+
+
+def load_checkpoint(filepath: str) -> Dict[str, Tensor]:
+    r"""Loads a state_dict saved by :obj:`ModelCheckpoint`. If the file was
+    saved with ``delta=True`` the state_dict is rebuilt from the full
+    checkpoint it refers to, which must be in the same directory
+
+    Parameters
+    ----------
+    filepath: str
+        path to a file saved by :obj:`ModelCheckpoint`
+
+    Returns
+    -------
+    state_dict: Dict
+        state_dict that can be loaded with ``model.load_state_dict``
+    """
+    checkpoint = torch.load(filepath)
+    if "delta_base" not in checkpoint:
+        return checkpoint
+    state_dict = torch.load(
+        os.path.join(os.path.dirname(filepath), checkpoint["delta_base"])
+    )
+    state_dict.update(checkpoint["delta_state_dict"])
+    return state_dict
+
+
+def _remove_file(filepath: str):
+    try:
+        os.remove(filepath)
+    except FileNotFoundError:
+        pass
+
+
+def _to_float(value: Any) -> float:
+    # 0-d tensors (a hidden device sync if compared as they are) and numpy
+    # scalars are converted once, so comparisons are between Python floats
+    if isinstance(value, (Tensor, np.generic)):
+        return value.item()
+    return float(value)
+
+
+def _no_op_batch(batch: int, logs: Optional[Dict] = None):
+    pass
 
 
 def _is_metric(monitor: str):
@@ -42,6 +143,33 @@ class CallbackContainer(object):
                     instantiated_callbacks.append(callback)
         self.callbacks = [c for c in instantiated_callbacks]
         self.queue_length = queue_length
+        self._bind_hooks()
+
+    def _bind_hooks(self):
+        # the bound methods are looked up only once, rather than once per
+        # callback every time a hook is called (i.e. every batch). Callbacks
+        # that do not override a given hook are left out of its list
+        self._on_epoch_begin_fns = self._overridden("on_epoch_begin")
+        self._on_epoch_end_fns = self._overridden("on_epoch_end")
+        self._on_batch_begin_fns = self._overridden("on_batch_begin")
+        self._on_batch_end_fns = self._overridden("on_batch_end")
+        self._on_train_begin_fns = self._overridden("on_train_begin")
+        self._on_train_end_fns = self._overridden("on_train_end")
+        self._on_eval_begin_fns = self._overridden("on_eval_begin")
+        # the batch hooks run every minibatch, so if no callback uses them
+        # they are replaced by a function that does nothing
+        if not self._on_batch_begin_fns:
+            self.on_batch_begin = _no_op_batch  # type: ignore[assignment]
+        if not self._on_batch_end_fns:
+            self.on_batch_end = _no_op_batch  # type: ignore[assignment]
+
+    def _overridden(self, hook: str) -> List[Callable]:
+        return [
+            getattr(c, hook)
+            for c in self.callbacks
+            if getattr(getattr(c, hook), "__func__", None)
+            is not getattr(Callback, hook)
+        ]
 
     def set_params(self, params):
         for callback in self.callbacks:
@@ -53,56 +181,70 @@ class CallbackContainer(object):
             callback.set_model(model)
 
     def set_trainer(self, trainer: Any):
-        self.trainer = trainer
+        # the trainer holds the container, so the back-reference is weak
+        self.trainer = weakref.proxy(trainer)
         for callback in self.callbacks:
             callback.set_trainer(trainer)
 
+    def __getstate__(self):
+        # the weak reference to the trainer cannot be pickled, the trainer
+        # and model are set again by the Trainer when unpickled
+        d = self.__dict__
+        self_dict = {k: d[k] for k in d if k not in ["trainer", "model"]}
+        return self_dict
+
+    def __setstate__(self, state):
+        self.__dict__ = state
+
     def on_epoch_begin(self, epoch: int, logs: Optional[Dict] = None):
-        logs = logs or {}
-        for callback in self.callbacks:
-            callback.on_epoch_begin(epoch, logs)
+        logs = {} if logs is None else logs
+        for fn in self._on_epoch_begin_fns:
+            fn(epoch, logs)
 
     def on_epoch_end(
         self, epoch: int, logs: Optional[Dict] = None, metric: Optional[float] = None
     ):
-        logs = logs or {}
-        for callback in self.callbacks:
-            callback.on_epoch_end(epoch, logs, metric)
+        logs = {} if logs is None else logs
+        for fn in self._on_epoch_end_fns:
+            fn(epoch, logs, metric)
 
     def on_batch_begin(self, batch: int, logs: Optional[Dict] = None):
-        logs = logs or {}
-        for callback in self.callbacks:
-            callback.on_batch_begin(batch, logs)
+        logs = {} if logs is None else logs
+        for fn in self._on_batch_begin_fns:
+            fn(batch, logs)
 
     def on_batch_end(self, batch: int, logs: Optional[Dict] = None):
-        logs = logs or {}
-        for callback in self.callbacks:
-            callback.on_batch_end(batch, logs)
+        logs = {} if logs is None else logs
+        for fn in self._on_batch_end_fns:
+            fn(batch, logs)
 
     def on_train_begin(self, logs: Optional[Dict] = None):
-        logs = logs or {}
+        logs = {} if logs is None else logs
         logs["start_time"] = _get_current_time()
-        for callback in self.callbacks:
-            callback.on_train_begin(logs)
+        for fn in self._on_train_begin_fns:
+            fn(logs)
 
     def on_train_end(self, logs: Optional[Dict] = None):
-        logs = logs or {}
+        logs = {} if logs is None else logs
         # logs['final_loss'] = self.model.history.epoch_losses[-1],
         # logs['best_loss'] = min(self.model.history.epoch_losses),
         # logs['stop_time'] = _get_current_time()
-        for callback in self.callbacks:
-            callback.on_train_end(logs)
+        for fn in self._on_train_end_fns:
+            fn(logs)
 
     def on_eval_begin(self, logs: Optional[Dict] = None):
         # at the moment only used to reset metrics before eval
-        logs = logs or {}
-        for callback in self.callbacks:
-            callback.on_eval_begin(logs)
+        logs = {} if logs is None else logs
+        for fn in self._on_eval_begin_fns:
+            fn(logs)
 
 
 class Callback(object):
     """
     Base class used to build new callbacks.
+
+    When the :obj:`Trainer` does not pass any logs to a hook, the callbacks
+    receive a new, empty dictionary.
     """
 
     def __init__(self):
@@ -115,7 +257,20 @@ class Callback(object):
         self.model = model
 
     def set_trainer(self, trainer: Any):
-        self.trainer = trainer
+        # the trainer holds the callbacks, so the back-reference is weak to
+        # avoid a reference cycle that keeps the trainer (and its history and
+        # model) alive until the garbage collector runs
+        self.trainer = weakref.proxy(trainer)
+
+    def __getstate__(self):
+        # the weak reference to the trainer cannot be pickled, the trainer
+        # and model are set again by the Trainer when unpickled
+        d = self.__dict__
+        self_dict = {k: d[k] for k in d if k not in ["trainer", "model"]}
+        return self_dict
+
+    def __setstate__(self, state):
+        self.__dict__ = state
 
     def on_epoch_begin(self, epoch: int, logs: Optional[Dict] = None):
         pass
@@ -145,21 +300,95 @@ class Callback(object):
 class History(Callback):
     r"""Callback that records metrics to a ``history`` attribute.
 
-    This callback runs by default within :obj:`Trainer`, therefore, should not
-    be passed to the :obj:`Trainer`. Is included here just for completion.
+    This callback runs by default within :obj:`Trainer`. It only needs to be
+    passed to the :obj:`Trainer` to change how often the metrics are
+    recorded, in which case it replaces the default one.
+
+    Parameters
+    ----------
+    log_every_epoch: int, default=1
+        Every ``log_every_epoch``-th value of each epoch log is recorded,
+        starting from the first one. Values are counted per log, so that
+        validation metrics computed every ``validation_freq`` epochs (see
+        :obj:`Trainer.fit`) are thinned out in the same way
+    log_every_batch: int, default=0
+        If greater than 0, the mean training loss over every
+        ``log_every_batch`` batches is also recorded under the
+        ``train_loss_batch`` key. These windows do not span across epochs
+
+    Scalar epoch logs are written to numpy arrays preallocated for the whole
+    training run (``n_epochs`` is taken from the ``on_train_begin`` logs).
+    The ``history`` attribute holds views of these arrays that only include
+    the values recorded so far. Any other value is stored in a list.
     """
 
+    def __init__(self, log_every_epoch: int = 1, log_every_batch: int = 0):
+        super(History, self).__init__()
+
+        if log_every_epoch < 1 or log_every_batch < 0:
+            raise ValueError(
+                "'log_every_epoch' must be greater than 0 and 'log_every_batch' "
+                "must be greater than or equal to 0"
+            )
+
+        self.log_every_epoch = log_every_epoch
+        self.log_every_batch = log_every_batch
+        self._max_records: Optional[int] = None
+        self._buffers: Dict[str, np.ndarray] = {}
+        self._n_records: Dict[str, int] = {}
+        self._n_seen: Dict[str, int] = {}
+
+        # History is only hooked to the batch loop if it needs it
+        if self.log_every_batch > 0:
+            self.on_batch_end = self._log_batch_loss  # type: ignore[assignment]
+
     def on_train_begin(self, logs: Optional[Dict] = None):
         self.trainer.history = {}
+        n_epochs = (_EMPTY_LOGS if logs is None else logs).get("n_epochs")
+        self._max_records = (
+            math.ceil(n_epochs / self.log_every_epoch) if n_epochs else None
+        )
+        self._buffers = {}
+        self._n_records = {}
+        self._n_seen = {}
 
     def on_epoch_end(
         self, epoch: int, logs: Optional[Dict] = None, metric: Optional[float] = None
     ):
-        logs = logs or {}
-        for k, v in logs.items():
+        history = self.trainer.history
+        for k, v in (_EMPTY_LOGS if logs is None else logs).items():
+            n_seen = self._n_seen.get(k, 0)
+            self._n_seen[k] = n_seen + 1
+            if n_seen % self.log_every_epoch != 0:
+                continue
             if isinstance(v, np.ndarray):
                 v = v.tolist()
-            self.trainer.history.setdefault(k, []).append(v)
+            if k not in history:
+                if self._max_records is not None and isinstance(v, numbers.Real):
+                    self._buffers[k] = np.full(self._max_records, np.nan)
+                else:
+                    history[k] = []
+                self._n_records[k] = 0
+            n_records = self._n_records[k]
+            if k in self._buffers:
+                self._buffers[k][n_records] = v
+                # a view, so that no padding is exposed while training
+                history[k] = self._buffers[k][: n_records + 1]
+            else:
+                history[k].append(v)
+            self._n_records[k] = n_records + 1
+
+    def _log_batch_loss(self, batch: int, logs: Optional[Dict] = None):
+        # the mean loss over the window is computed from the trainer's
+        # running loss, so there is no need to keep the individual values
+        if batch == 0:
+            self._running_loss_at_last_log = 0.0
+        if (batch + 1) % self.log_every_batch == 0:
+            running_loss = self.trainer.train_running_loss
+            self.trainer.history.setdefault("train_loss_batch", []).append(
+                (running_loss - self._running_loss_at_last_log) / self.log_every_batch
+            )
+            self._running_loss_at_last_log = running_loss
 
 
 class LRShedulerCallback(Callback):
@@ -263,9 +492,50 @@ class LRHistory(Callback):
         super(LRHistory, self).__init__()
         self.n_epochs = n_epochs
 
+    def on_train_begin(self, logs: Optional[Dict] = None):
+        # whether the scheduler(s) are cyclic and the names of the param
+        # groups do not change during training, so they are computed here
+        # rather than every batch
+        if self.trainer.lr_scheduler is not None:
+            self._is_multi = (
+                self.trainer.lr_scheduler.__class__.__name__ == "MultipleLRScheduler"
+            )
+            if self._is_multi:
+                self._cyclic_by_name = {
+                    model_name: "cycl" in scheduler.__class__.__name__.lower()
+                    for (
+                        model_name,
+                        scheduler,
+                    ) in self.trainer.lr_scheduler._schedulers.items()
+                }
+                self._group_names = {
+                    model_name: [
+                        ("_").join(["lr", model_name, str(group_idx)])
+                        for group_idx in range(len(opt.param_groups))
+                    ]
+                    for model_name, opt in self.trainer.optimizer._optimizers.items()
+                }
+            else:
+                self._cyclic_by_name = {}
+                self._group_names = {
+                    None: [
+                        ("_").join(["lr", str(group_idx)])
+                        for group_idx in range(len(self.trainer.optimizer.param_groups))
+                    ]
+                }
+
     def on_epoch_begin(self, epoch: int, logs: Optional[Dict] = None):
         if epoch == 0 and self.trainer.lr_scheduler is not None:
             self.trainer.lr_history = {}
+            # keep a reference to each param group's list so that saving a
+            # learning rate is a plain append
+            self._lr_lists = {
+                model_name: [
+                    self.trainer.lr_history.setdefault(group_name, [])
+                    for group_name in group_names
+                ]
+                for model_name, group_names in self._group_names.items()
+            }
             if self._multiple_scheduler():
                 self._save_group_lr_mulitple_scheduler(step_location="on_epoch_begin")
             else:
@@ -299,27 +569,17 @@ class LRHistory(Callback):
                     self._save_group_lr(opt, model_name)
 
     def _save_group_lr(self, opt: Optimizer, model_name: Optional[str] = None):
-        for group_idx, group in enumerate(opt.param_groups):
-            if model_name is not None:
-                group_name = ("_").join(["lr", model_name, str(group_idx)])
-            else:
-                group_name = ("_").join(["lr", str(group_idx)])
-            self.trainer.lr_history.setdefault(group_name, []).append(group["lr"])
+        for group, lr_list in zip(opt.param_groups, self._lr_lists[model_name]):
+            lr_list.append(group["lr"])
 
     def _multiple_scheduler(self):
-        return self.trainer.lr_scheduler.__class__.__name__ == "MultipleLRScheduler"
+        return self._is_multi
 
     def _is_cyclic(self, model_name: str):
-        return (
-            self._has_scheduler(model_name)
-            and "cycl"
-            in self.trainer.lr_scheduler._schedulers[
-                model_name
-            ].__class__.__name__.lower()
-        )
+        return self._cyclic_by_name.get(model_name, False)
 
     def _has_scheduler(self, model_name: str):
-        return model_name in self.trainer.lr_scheduler._schedulers
+        return model_name in self._cyclic_by_name
 
 
 class ModelCheckpoint(Callback):
@@ -357,6 +617,24 @@ class ModelCheckpoint(Callback):
         Interval (number of epochs) between checkpoints.
     max_save: int, default=-1
         Maximum number of outputs to save. If -1 will save all outputs
+    delta: bool, default=False
+        Only used if ``save_best_only=False``. If ``True``, only the tensors
+        that changed since the last full checkpoint are saved, together with
+        the name of that checkpoint. A full checkpoint is saved every
+        ``full_save_every`` saves. Files saved this way must be loaded with
+        :obj:`pytorch_widedeep.callbacks.load_checkpoint`. Note that a CPU
+        copy of the last full checkpoint is kept in memory during training
+    delta_threshold: float, default=0.
+        A tensor is considered to have changed if any of its elements
+        changed by more than ``delta_threshold`` (in absolute value)
+    full_save_every: int, default=10
+        Interval (number of saves) between full checkpoints when
+        ``delta=True``
+
+    Note that, during training, the weights are copied to CPU at the end of
+    the epoch and written to disk by a background thread, so training does
+    not wait for the I/O. All pending writes are completed when training
+    ends.
 
     Attributes
     ----------
@@ -388,6 +666,9 @@ class ModelCheckpoint(Callback):
         mode: str = "auto",
         period: int = 1,
         max_save: int = -1,
+        delta: bool = False,
+        delta_threshold: float = 0.0,
+        full_save_every: int = 10,
     ):
         super(ModelCheckpoint, self).__init__()
 
@@ -398,21 +679,42 @@ class ModelCheckpoint(Callback):
         self.mode = mode
         self.period = period
         self.max_save = max_save
+        self.delta = delta
+        self.delta_threshold = delta_threshold
+        self.full_save_every = full_save_every
 
         self.epochs_since_last_save = 0
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._futures: List = []
 
-        if len(self.filepath.split("/")[:-1]) == 0:
+        if self.delta and self.save_best_only:
+            warnings.warn(
+                "'delta' checkpoints are only available when "
+                "'save_best_only=False'. Full checkpoints will be saved",
+                RuntimeWarning,
+            )
+            self.delta = False
+        # last full checkpoint, its path and the number of saves since then
+        self._base_state_dict: Optional[Dict[str, Tensor]] = None
+        self._base_filepath: Optional[str] = None
+        self._saves_since_full_save = 0
+        # base checkpoint of each delta file and files waiting to be removed
+        # once no delta file kept refers to them
+        self._bases: Dict[str, str] = {}
+        self._to_remove: List[str] = []
+
+        root_dir = os.path.dirname(self.filepath)
+        if not root_dir:
             raise ValueError(
                 "'filepath' must be the full path to save the output weights,"
                 " including the root of the filenames. e.g. 'checkpoints/weights_out'"
             )
-
-        root_dir = ("/").join(self.filepath.split("/")[:-1])
-        if not os.path.exists(root_dir):
-            os.makedirs(root_dir)
+        os.makedirs(root_dir, exist_ok=True)
+        self._prefix = self.filepath + "_"
 
         if self.max_save > 0:
-            self.old_files: List[str] = []
+            # appending to a full deque drops (and we remove) the oldest file
+            self.old_files: deque = deque(maxlen=self.max_save)
 
         if self.mode not in ["auto", "min", "max"]:
             warnings.warn(
@@ -422,29 +724,40 @@ class ModelCheckpoint(Callback):
             )
             self.mode = "auto"
         if self.mode == "min":
-            self.monitor_op = np.less
-            self.best = np.Inf
+            self.monitor_op = operator.lt
+            self.best = math.inf
         elif self.mode == "max":
-            self.monitor_op = np.greater
-            self.best = -np.Inf
+            self.monitor_op = operator.gt
+            self.best = -math.inf
         else:
             if _is_metric(self.monitor):
-                self.monitor_op = np.greater
-                self.best = -np.Inf
+                self.monitor_op = operator.gt
+                self.best = -math.inf
             else:
-                self.monitor_op = np.less
-                self.best = np.Inf
+                self.monitor_op = operator.lt
+                self.best = math.inf
+
+    def on_train_begin(self, logs: Optional[Dict] = None):
+        if self._executor is not None:
+            # left over from a run that was interrupted before on_train_end.
+            # Its pending writes are completed and its errors, already raised
+            # or stale, are discarded
+            self._executor.shutdown(wait=True)
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._futures = []
+        # the first delta checkpoint of every run refers to a new full one
+        self._base_state_dict = None
+        self._saves_since_full_save = 0
 
     def on_epoch_end(  # noqa: C901
         self, epoch: int, logs: Optional[Dict] = None, metric: Optional[float] = None
     ):
-        logs = logs or {}
         self.epochs_since_last_save += 1
         if self.epochs_since_last_save >= self.period:
             self.epochs_since_last_save = 0
-            filepath = "{}_{}.p".format(self.filepath, epoch + 1)
+            filepath = self._prefix + str(epoch + 1) + ".p"
             if self.save_best_only:
-                current = logs.get(self.monitor)
+                current = (_EMPTY_LOGS if logs is None else logs).get(self.monitor)
                 if current is None:
                     warnings.warn(
                         "Can save best model only with %s available, "
@@ -452,6 +765,7 @@ class ModelCheckpoint(Callback):
                         RuntimeWarning,
                     )
                 else:
+                    current = _to_float(current)
                     if self.monitor_op(current, self.best):
                         if self.verbose > 0:
                             print(
@@ -467,15 +781,8 @@ class ModelCheckpoint(Callback):
                             )
                         self.best = current
                         self.best_epoch = epoch
-                        torch.save(self.model.state_dict(), filepath)
-                        if self.max_save > 0:
-                            if len(self.old_files) == self.max_save:
-                                try:
-                                    os.remove(self.old_files[0])
-                                except FileNotFoundError:
-                                    pass
-                                self.old_files = self.old_files[1:]
-                            self.old_files.append(filepath)
+                        self._save(filepath)
+                        self._keep(filepath)
                     else:
                         if self.verbose > 0:
                             print(
@@ -485,23 +792,99 @@ class ModelCheckpoint(Callback):
             else:
                 if self.verbose > 0:
                     print("\nEpoch %05d: saving model to %s" % (epoch + 1, filepath))
-                torch.save(self.model.state_dict(), filepath)
-                if self.max_save > 0:
-                    if len(self.old_files) == self.max_save:
-                        try:
-                            os.remove(self.old_files[0])
-                        except FileNotFoundError:
-                            pass
-                        self.old_files = self.old_files[1:]
-                    self.old_files.append(filepath)
+                if self.delta:
+                    self._save_delta(filepath)
+                else:
+                    self._save(filepath)
+                self._keep(filepath)
+
+    def on_train_end(self, logs: Optional[Dict] = None):
+        if self._executor is not None:
+            executor, futures = self._executor, self._futures
+            self._executor, self._futures = None, []
+            executor.shutdown(wait=True)
+            # re-raises any exception that occurred while writing to disk
+            for future in futures:
+                future.result()
+        # the copy of the last full checkpoint is only needed while training
+        self._base_state_dict = None
+        self._base_filepath = None
+
+    def _save(self, filepath: str):
+        if self._executor is None:
+            _save_state_dict(self.model.state_dict(), filepath)
+        else:
+            self._submit(_save_state_dict, _state_dict_snapshot(self.model), filepath)
+
+    def _save_delta(self, filepath: str):
+        state_dict = _state_dict_snapshot(self.model)
+        if (
+            self._base_state_dict is None
+            or self._saves_since_full_save >= self.full_save_every
+        ):
+            self._base_state_dict = state_dict
+            self._base_filepath = filepath
+            self._saves_since_full_save = 0
+            fn: Callable = _save_state_dict
+            args: Tuple = (state_dict, filepath)
+        else:
+            self._bases[filepath] = self._base_filepath
+            fn = _save_delta_state_dict
+            args = (
+                state_dict,
+                self._base_state_dict,
+                self._base_filepath,
+                filepath,
+                self.delta_threshold,
+            )
+        self._saves_since_full_save += 1
+        if self._executor is None:
+            fn(*args)
+        else:
+            self._submit(fn, *args)
+
+    def _keep(self, filepath: str):
+        if self.max_save > 0:
+            if len(self.old_files) == self.max_save:
+                self._to_remove.append(self.old_files[0])
+            self.old_files.append(filepath)
+            # a full checkpoint is only removed when no delta file refers to it
+            needed = set(self.old_files) | {
+                self._bases[f] for f in self.old_files if f in self._bases
+            }
+            for f in [f for f in self._to_remove if f not in needed]:
+                self._remove(f)
+                self._to_remove.remove(f)
+                self._bases.pop(f, None)
+
+    def _remove(self, filepath: str):
+        # removals go through the same (single) worker as the saves so that a
+        # file is never removed before it has been written
+        if self._executor is None:
+            _remove_file(filepath)
+        else:
+            self._submit(_remove_file, filepath)
+
+    def _submit(self, fn: Callable, *args):
+        # surface errors from previous writes as early as possible. The
+        # finished futures are dropped first so that an error is raised once
+        done = [future for future in self._futures if future.done()]
+        self._futures = [future for future in self._futures if not future.done()]
+        for future in done:
+            future.result()
+        self._futures.append(self._executor.submit(fn, *args))
 
     def __getstate__(self):
         d = self.__dict__
-        self_dict = {k: d[k] for k in d if k not in ["trainer", "model"]}
+        excluded = ["trainer", "model", "_executor", "_futures", "_base_state_dict"]
+        self_dict = {k: d[k] for k in d if k not in excluded}
         return self_dict
 
     def __setstate__(self, state):
         self.__dict__ = state
+        self._executor = None
+        self._futures = []
+        self._base_state_dict = None
 
 
 class EarlyStopping(Callback):
@@ -594,16 +977,16 @@ class EarlyStopping(Callback):
             self.mode = "auto"
 
         if self.mode == "min":
-            self.monitor_op = np.less
+            self.monitor_op = operator.lt
         elif self.mode == "max":
-            self.monitor_op = np.greater
+            self.monitor_op = operator.gt
         else:
             if _is_metric(self.monitor):
-                self.monitor_op = np.greater
+                self.monitor_op = operator.gt
             else:
-                self.monitor_op = np.less
+                self.monitor_op = operator.lt
 
-        if self.monitor_op == np.greater:
+        if self.monitor_op is operator.gt:
             self.min_delta *= 1
         else:
             self.min_delta *= -1
@@ -613,14 +996,14 @@ class EarlyStopping(Callback):
         self.wait = 0
         self.stopped_epoch = 0
         if self.baseline is not None:
-            self.best = self.baseline
+            self.best = _to_float(self.baseline)
         else:
-            self.best = np.Inf if self.monitor_op == np.less else -np.Inf
+            self.best = math.inf if self.monitor_op is operator.lt else -math.inf
 
     def on_epoch_end(
         self, epoch: int, logs: Optional[Dict] = None, metric: Optional[float] = None
     ):
-        current = self.get_monitor_value(logs)
+        current = self.get_monitor_value(_EMPTY_LOGS if logs is None else logs)
         if current is None:
             return
 
@@ -628,7 +1011,9 @@ class EarlyStopping(Callback):
             self.best = current
             self.wait = 0
             if self.restore_best_weights:
-                self.state_dict = self.model.state_dict()
+                # model.state_dict() references the live parameters,
+                # which would keep being updated by the following epochs
+                self.state_dict = _state_dict_snapshot(self.model)
         else:
             self.wait += 1
             if self.wait >= self.patience:
@@ -652,12 +1037,5 @@ class EarlyStopping(Callback):
                 % (self.monitor, ",".join(list(logs.keys()))),
                 RuntimeWarning,
             )
-        return monitor_value
-
-    def __getstate__(self):
-        d = self.__dict__
-        self_dict = {k: d[k] for k in d if k not in ["trainer", "model"]}
-        return self_dict
-
-    def __setstate__(self, state):
-        self.__dict__ = state
+            return None
+        return _to_float(monitor_value)
@@ -125,7 +125,8 @@ class Trainer:
         List with :obj:`Callback` objects. The three callbacks available in
         ``pytorch-widedeep`` are: ``LRHistory``, ``ModelCheckpoint`` and
         ``EarlyStopping``. The ``History`` and the ``LRShedulerCallback``
-        callbacks are used by default. This can also be a custom callback as
+        callbacks are used by default. A ``History`` object passed here
+        replaces the default one. This can also be a custom callback as
         long as the object of type ``Callback``. See
         :obj:`pytorch_widedeep.callbacks.Callback` or the `Examples
         <https://github.com/jrzaurin/pytorch-widedeep/tree/master/examples>`__
@@ -896,7 +897,13 @@ class Trainer:
 
         # the trainer is run with the History Callback by default
         with open(history_dir / "train_eval_history.json", "w") as teh:
-            json.dump(self.history, teh)  # type: ignore[attr-defined]
+            json.dump(
+                {
+                    k: v.tolist() if isinstance(v, np.ndarray) else v
+                    for k, v in self.history.items()  # type: ignore[attr-defined]
+                },
+                teh,
+            )
 
         has_lr_history = any(
             [clbk.__class__.__name__ == "LRHistory" for clbk in self.callbacks]
@@ -1222,7 +1229,10 @@ class Trainer:
             for callback in callbacks:
                 if isinstance(callback, type):
                     callback = callback()
-                self.callbacks.append(callback)
+                if isinstance(callback, History):
+                    self.callbacks[0] = callback
+                else:
+                    self.callbacks.append(callback)
         if metrics is not None:
             self.metric = MultipleMetrics(metrics)
             self.callbacks += [MetricCallback(self.metric)]
@@ -1231,3 +1241,10 @@ class Trainer:
         self.callback_container = CallbackContainer(self.callbacks)
         self.callback_container.set_model(self.model)
         self.callback_container.set_trainer(self)
+
+    def __setstate__(self, state):
+        self.__dict__ = state
+        # the callbacks do not pickle their references to the trainer and the
+        # model, so these are set again
+        self.callback_container.set_model(self.model)
+        self.callback_container.set_trainer(self)
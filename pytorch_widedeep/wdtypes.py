@@ -7,6 +7,7 @@ from typing import (
     Match,
     Tuple,
     Union,
+    Mapping,
     Callable,
     Iterable,
     Iterator,
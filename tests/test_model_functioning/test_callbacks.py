@@ -1,7 +1,11 @@
+import gc
 import os
+import math
 import pickle
 import shutil
 import string
+import weakref
+import operator
 from pathlib import Path
 from itertools import chain
 
@@ -14,9 +18,15 @@ from pytorch_widedeep.optim import RAdam
 from pytorch_widedeep.models import Wide, TabMlp, WideDeep, TabTransformer
 from pytorch_widedeep.training import Trainer
 from pytorch_widedeep.callbacks import (
+    History,
+    Callback,
     LRHistory,
     EarlyStopping,
     ModelCheckpoint,
+    CallbackContainer,
+    LRShedulerCallback,
+    _no_op_batch,
+    load_checkpoint,
 )
 
 # Wide array
@@ -134,6 +144,80 @@ def test_history_callback(
     assert all(out)
 
 
+@pytest.mark.parametrize(
+    "log_every_epoch, log_every_batch, val_split, validation_freq, len_loss_output, "
+    "len_batch_loss_output, len_val_loss_output",
+    [
+        (1, 0, None, 1, 5, None, None),
+        (2, 0, None, 1, 3, None, None),
+        (1, 1, None, 1, 5, 10, None),
+        (2, 2, None, 1, 3, 5, None),
+        (1, 0, 0.2, 2, 5, None, 2),
+        (2, 0, 0.2, 2, 3, None, 1),
+        (2, 0, 0.2, 1, 3, None, 3),
+    ],
+)
+def test_history_callback_log_every(
+    log_every_epoch,
+    log_every_batch,
+    val_split,
+    validation_freq,
+    len_loss_output,
+    len_batch_loss_output,
+    len_val_loss_output,
+):
+    trainer = Trainer(
+        model=model,
+        objective="binary",
+        callbacks=[History(log_every_epoch, log_every_batch)],
+        verbose=0,
+    )
+    trainer.fit(
+        X_wide=X_wide,
+        X_tab=X_tab,
+        target=target,
+        n_epochs=5,
+        batch_size=16,
+        val_split=val_split,
+        validation_freq=validation_freq,
+    )
+    n_history_callbacks = len([c for c in trainer.callbacks if isinstance(c, History)])
+    assert n_history_callbacks == 1
+    assert isinstance(trainer.history["train_loss"], np.ndarray)
+    assert len(trainer.history["train_loss"]) == len_loss_output
+    assert not np.isnan(trainer.history["train_loss"]).any()
+    if len_batch_loss_output is None:
+        assert "train_loss_batch" not in trainer.history
+    else:
+        assert len(trainer.history["train_loss_batch"]) == len_batch_loss_output
+    if len_val_loss_output is None:
+        assert "val_loss" not in trainer.history
+    else:
+        assert len(trainer.history["val_loss"]) == len_val_loss_output
+        assert not np.isnan(trainer.history["val_loss"]).any()
+
+
+def test_history_during_training():
+    class HistoryReader(Callback):
+        def __init__(self):
+            self.train_losses = []
+
+        def on_epoch_end(self, epoch, logs=None, metric=None):
+            self.train_losses.append(self.trainer.history["train_loss"].copy())
+
+    history_reader = HistoryReader()
+    trainer = Trainer(
+        model=model,
+        objective="binary",
+        callbacks=[history_reader],
+        verbose=0,
+    )
+    trainer.fit(X_wide=X_wide, X_tab=X_tab, target=target, n_epochs=3, batch_size=16)
+
+    assert [len(losses) for losses in history_reader.train_losses] == [1, 2, 3]
+    assert not np.isnan(np.concatenate(history_reader.train_losses)).any()
+
+
 ###############################################################################
 # Test that EarlyStopping stops as expected
 ###############################################################################
@@ -162,6 +246,42 @@ def test_early_stop():
     assert len(trainer.history["train_loss"]) == 3 + 1
 
 
+def test_early_stop_restore_best_weights():
+    wide = Wide(np.unique(X_wide).shape[0], 1)
+    deeptabular = TabMlp(
+        mlp_hidden_dims=[32, 16],
+        column_idx=column_idx,
+        embed_input=embed_input,
+        continuous_cols=colnames[-5:],
+    )
+    model = WideDeep(wide=wide, deeptabular=deeptabular)
+    # only the first epoch counts as an improvement
+    early_stopping = EarlyStopping(min_delta=5.0, patience=2, restore_best_weights=True)
+    trainer = Trainer(
+        model=model,
+        objective="binary",
+        callbacks=[early_stopping],
+        verbose=0,
+    )
+    trainer.fit(X_wide=X_wide, X_tab=X_tab, target=target, val_split=0.2, n_epochs=5)
+
+    best_state_dict = early_stopping.state_dict
+    model_state_dict = model.state_dict()
+
+    shares_memory = any(
+        [
+            v.data_ptr() == model_state_dict[k].data_ptr()
+            for k, v in best_state_dict.items()
+        ]
+    )
+    restored = all(
+        [torch.equal(v, model_state_dict[k]) for k, v in best_state_dict.items()]
+    )
+
+    assert len(trainer.history["train_loss"]) == 2 + 1
+    assert not shares_memory and restored
+
+
 ###############################################################################
 # Test that ModelCheckpoint behaves as expected
 ###############################################################################
@@ -198,6 +318,133 @@ def test_model_checkpoint(save_best_only, max_save, n_files):
     assert n_saved <= n_files
 
 
+def test_model_checkpoint_saved_weights():
+    wide = Wide(np.unique(X_wide).shape[0], 1)
+    deeptabular = TabMlp(
+        mlp_hidden_dims=[32, 16],
+        column_idx=column_idx,
+        embed_input=embed_input,
+        continuous_cols=colnames[-5:],
+    )
+    model = WideDeep(wide=wide, deeptabular=deeptabular)
+    model_checkpoint = ModelCheckpoint(
+        "tests/test_model_functioning/weights/test_weights", max_save=1
+    )
+    trainer = Trainer(
+        model=model,
+        objective="binary",
+        callbacks=[model_checkpoint],
+        verbose=0,
+    )
+    trainer.fit(X_wide=X_wide, X_tab=X_tab, target=target, n_epochs=3)
+    saved_files = os.listdir("tests/test_model_functioning/weights/")
+    saved_state_dict = torch.load(
+        "tests/test_model_functioning/weights/test_weights_3.p"
+    )
+
+    shutil.rmtree("tests/test_model_functioning/weights/")
+
+    assert saved_files == ["test_weights_3.p"]
+    assert model_checkpoint._executor is None
+    assert all(
+        [torch.equal(v, saved_state_dict[k]) for k, v in model.state_dict().items()]
+    )
+
+
+def test_model_checkpoint_recovers_from_write_error():
+    wide = Wide(np.unique(X_wide).shape[0], 1)
+    deeptabular = TabMlp(
+        mlp_hidden_dims=[32, 16],
+        column_idx=column_idx,
+        embed_input=embed_input,
+        continuous_cols=colnames[-5:],
+    )
+    model = WideDeep(wide=wide, deeptabular=deeptabular)
+    model_checkpoint = ModelCheckpoint(
+        "tests/test_model_functioning/weights/test_weights", max_save=1
+    )
+    trainer = Trainer(
+        model=model,
+        objective="binary",
+        callbacks=[model_checkpoint],
+        verbose=0,
+    )
+    # a directory in place of the first checkpoint makes its write fail.
+    # Depending on the torch version this raises an OSError or a RuntimeError
+    os.makedirs("tests/test_model_functioning/weights/test_weights_1.p")
+    with pytest.raises((OSError, RuntimeError)):
+        trainer.fit(X_wide=X_wide, X_tab=X_tab, target=target, n_epochs=5)
+    leftover_executor = model_checkpoint._executor
+    shutil.rmtree("tests/test_model_functioning/weights/")
+    os.makedirs("tests/test_model_functioning/weights/")
+
+    trainer.fit(X_wide=X_wide, X_tab=X_tab, target=target, n_epochs=3)
+    saved_files = os.listdir("tests/test_model_functioning/weights/")
+
+    shutil.rmtree("tests/test_model_functioning/weights/")
+
+    assert saved_files == ["test_weights_3.p"]
+    assert leftover_executor is None or leftover_executor._shutdown
+    assert model_checkpoint._executor is None
+    assert model_checkpoint._futures == []
+
+
+@pytest.mark.parametrize(
+    "max_save, full_save_every, saved_files",
+    [
+        (-1, 2, ["test_weights_1.p", "test_weights_2.p", "test_weights_3.p"]),
+        (1, 10, ["test_weights_1.p", "test_weights_3.p"]),
+        (1, 2, ["test_weights_3.p"]),
+    ],
+)
+def test_model_checkpoint_delta(max_save, full_save_every, saved_files):
+    wide = Wide(np.unique(X_wide).shape[0], 1)
+    deeptabular = TabMlp(
+        mlp_hidden_dims=[32, 16],
+        column_idx=column_idx,
+        embed_input=embed_input,
+        continuous_cols=colnames[-5:],
+    )
+    model = WideDeep(wide=wide, deeptabular=deeptabular)
+    # the wide component is not trained and therefore never changes
+    for p in model.wide.parameters():
+        p.requires_grad = False
+    trainer = Trainer(
+        model=model,
+        objective="binary",
+        callbacks=[
+            ModelCheckpoint(
+                "tests/test_model_functioning/weights/test_weights",
+                max_save=max_save,
+                delta=True,
+                full_save_every=full_save_every,
+            )
+        ],
+        verbose=0,
+    )
+    trainer.fit(X_wide=X_wide, X_tab=X_tab, target=target, n_epochs=3)
+
+    files = sorted(os.listdir("tests/test_model_functioning/weights/"))
+    last_checkpoint = torch.load(
+        "tests/test_model_functioning/weights/test_weights_3.p"
+    )
+    state_dict = load_checkpoint(
+        "tests/test_model_functioning/weights/test_weights_3.p"
+    )
+
+    shutil.rmtree("tests/test_model_functioning/weights/")
+
+    is_delta = "delta_base" in last_checkpoint
+    if is_delta:
+        saved_keys = last_checkpoint["delta_state_dict"].keys()
+        assert not any([k.startswith("wide") for k in saved_keys])
+    assert is_delta == (full_save_every > 2)
+    assert files == saved_files
+    assert all([torch.equal(v, state_dict[k]) for k, v in model.state_dict().items()])
+    assert trainer.callbacks[-1]._base_state_dict is None
+    assert trainer.callbacks[-1]._base_filepath is None
+
+
 def test_filepath_error():
     wide = Wide(np.unique(X_wide).shape[0], 1)
     deeptabular = TabMlp(
@@ -339,14 +586,14 @@ def test_modelcheckpoint_mode_options():
     model_checkpoint_3 = ModelCheckpoint(filepath=fpath, monitor="acc", mode="max")
     model_checkpoint_4 = ModelCheckpoint(filepath=fpath, monitor="acc")
 
-    is_min = model_checkpoint_1.monitor_op is np.less
-    best_inf = model_checkpoint_1.best is np.Inf
-    auto_is_min = model_checkpoint_2.monitor_op is np.less
-    auto_best_inf = model_checkpoint_2.best is np.Inf
-    is_max = model_checkpoint_3.monitor_op is np.greater
-    best_minus_inf = -model_checkpoint_3.best == np.Inf
-    auto_is_max = model_checkpoint_4.monitor_op is np.greater
-    auto_best_minus_inf = -model_checkpoint_4.best == np.Inf
+    is_min = model_checkpoint_1.monitor_op is operator.lt
+    best_inf = model_checkpoint_1.best == math.inf
+    auto_is_min = model_checkpoint_2.monitor_op is operator.lt
+    auto_best_inf = model_checkpoint_2.best == math.inf
+    is_max = model_checkpoint_3.monitor_op is operator.gt
+    best_minus_inf = -model_checkpoint_3.best == math.inf
+    auto_is_max = model_checkpoint_4.monitor_op is operator.gt
+    auto_best_minus_inf = -model_checkpoint_4.best == math.inf
 
     shutil.rmtree("tests/test_model_functioning/modelcheckpoint/")
 
@@ -417,10 +664,10 @@ def test_early_stop_mode_options():
     early_stopping_3 = EarlyStopping(monitor="acc", mode="max")
     early_stopping_4 = EarlyStopping(monitor="acc")
 
-    is_min = early_stopping_1.monitor_op is np.less
-    auto_is_min = early_stopping_2.monitor_op is np.less
-    is_max = early_stopping_3.monitor_op is np.greater
-    auto_is_max = early_stopping_4.monitor_op is np.greater
+    is_min = early_stopping_1.monitor_op is operator.lt
+    auto_is_min = early_stopping_2.monitor_op is operator.lt
+    is_max = early_stopping_3.monitor_op is operator.gt
+    auto_is_max = early_stopping_4.monitor_op is operator.gt
 
     assert all(
         [
@@ -432,6 +679,18 @@ def test_early_stop_mode_options():
     )
 
 
+@pytest.mark.parametrize(
+    "monitor_value", [torch.tensor(0.5), np.float32(0.5), np.array(0.5), 0.5]
+)
+def test_early_stop_monitor_value_to_float(monitor_value):
+
+    early_stopping = EarlyStopping(monitor="val_loss")
+    early_stopping.on_train_begin()
+    early_stopping.on_epoch_end(0, {"val_loss": monitor_value})
+
+    assert type(early_stopping.best) is float and early_stopping.best == 0.5
+
+
 def test_early_stopping_get_state():
 
     early_stopping_path = Path("tests/test_model_functioning/early_stopping")
@@ -467,3 +726,114 @@ def test_early_stopping_get_state():
     shutil.rmtree("tests/test_model_functioning/early_stopping/")
 
     assert no_trainer and no_model
+
+
+def test_callback_container_skips_default_hooks():
+
+    callback_container = CallbackContainer(
+        [History(), LRShedulerCallback(), LRHistory(n_epochs=5), EarlyStopping]
+    )
+
+    batch_begin_fns = callback_container._on_batch_begin_fns
+    batch_end_owners = [
+        fn.__self__.__class__.__name__ for fn in callback_container._on_batch_end_fns
+    ]
+    epoch_end_owners = [
+        fn.__self__.__class__.__name__ for fn in callback_container._on_epoch_end_fns
+    ]
+
+    assert batch_begin_fns == []
+    assert callback_container.on_batch_begin is _no_op_batch
+    assert CallbackContainer([History()]).on_batch_end is _no_op_batch
+    assert batch_end_owners == ["LRShedulerCallback", "LRHistory"]
+    assert epoch_end_owners == [
+        "History",
+        "LRShedulerCallback",
+        "LRHistory",
+        "EarlyStopping",
+    ]
+
+
+def test_callback_container_passes_writable_logs():
+    class LogsWriter(Callback):
+        def on_batch_end(self, batch, logs=None):
+            logs["batch"] = batch
+
+        def on_eval_begin(self, logs=None):
+            logs["eval"] = True
+
+    callback_container = CallbackContainer([LogsWriter()])
+    callback_container.on_batch_end(batch=0)
+    callback_container.on_eval_begin()
+
+    logs = {}
+    callback_container.on_batch_end(batch=1, logs=logs)
+
+    assert logs == {"batch": 1}
+
+
+def test_trainer_pickle_and_refit():
+    wide = Wide(np.unique(X_wide).shape[0], 1)
+    deeptabular = TabMlp(
+        mlp_hidden_dims=[16, 4],
+        column_idx=column_idx,
+        embed_input=embed_input,
+        continuous_cols=colnames[-5:],
+    )
+    model = WideDeep(wide=wide, deeptabular=deeptabular)
+    optimizer = torch.optim.Adam(model.parameters())
+    trainer = Trainer(
+        model,
+        objective="binary",
+        optimizers=optimizer,
+        lr_schedulers=StepLR(optimizer, step_size=4),
+        callbacks=[LRHistory(n_epochs=2), EarlyStopping],
+        verbose=0,
+    )
+    trainer.fit(X_wide=X_wide, X_tab=X_tab, target=target, n_epochs=2, batch_size=16)
+
+    trainer = pickle.loads(pickle.dumps(trainer))
+
+    # the callbacks hold weak proxies, so the trainer is compared through
+    # one of its attributes
+    callbacks_set = all(
+        [
+            c.trainer.callback_container is trainer.callback_container
+            for c in trainer.callback_container.callbacks
+        ]
+        + [c.model is trainer.model for c in trainer.callback_container.callbacks]
+    )
+    trainer.fit(X_wide=X_wide, X_tab=X_tab, target=target, n_epochs=2, batch_size=16)
+
+    assert callbacks_set
+    assert len(trainer.history["train_loss"]) == 2
+    assert len(trainer.lr_history["lr_0"]) == 2
+
+
+def test_trainer_freed_without_gc():
+
+    trainer = Trainer(
+        model,
+        objective="binary",
+        callbacks=[LRHistory(n_epochs=2), EarlyStopping, History()],
+        verbose=0,
+    )
+    trainer.fit(
+        X_wide=X_wide,
+        X_tab=X_tab,
+        target=target,
+        n_epochs=2,
+        batch_size=16,
+    )
+    trainer_ref = weakref.ref(trainer)
+
+    # callbacks only hold weak references to the trainer, so deleting the
+    # trainer frees it without waiting for the cyclic garbage collector
+    gc.disable()
+    try:
+        del trainer
+        freed = trainer_ref() is None
+    finally:
+        gc.enable()
+
+    assert freed